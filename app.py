@@ -15,8 +15,20 @@ network_config_path = os.path.join(
     os.path.dirname(__file__), "app_ecosystem", "config", "network.json"
 )
 network_config = json.load(open(network_config_path))
+storage_config_path = os.path.join(
+    os.path.dirname(__file__), "app_ecosystem", "config", "storage.json"
+)
+storage_config = json.load(open(storage_config_path))
+compute_config_path = os.path.join(
+    os.path.dirname(__file__), "app_ecosystem", "config", "compute.json"
+)
+compute_config = json.load(open(compute_config_path))
 common_infra = CommonInfraStack(
-    cdk_app, construct_id="CommonInfraStack", network_config=network_config
+    cdk_app,
+    construct_id="CommonInfraStack",
+    network_config=network_config,
+    storage_config=storage_config,
+    compute_config=compute_config,
 )
 
 # Initialise a StandardAppStack for each app defined in the apps.json config file
@@ -6,6 +6,13 @@ from constructs import Construct
 
 from app_ecosystem.stacks.common_infra import CommonInfraStack
 
+# Task count scaling for EC2-placed apps, overridable per key via "task_scaling"
+DEFAULT_EC2_TASK_SCALING = {
+    "min_task_count": 1,
+    "max_task_count": 4,
+    "target_cpu_utilisation_percent": 50,
+}
+
 
 class AppSpecificComputeConstruct(Construct):
     def __init__(
@@ -20,11 +27,21 @@ class AppSpecificComputeConstruct(Construct):
 
         self.app_config = app_config
 
-        self.ecs_task_definition = ecs.FargateTaskDefinition(
+        # Placement is "fargate" (default) or "ec2" (warm pool backed EC2 capacity)
+        self.placement = self.app_config.get("placement", "fargate")
+        self.validate_placement(common_infra)
+
+        self.ecs_task_definition = ecs.TaskDefinition(
             self,
             f"{self.app_config['name'].title()}ECSTaskDefinition",
-            memory_limit_mib=self.app_config["total_task_memory"],
-            cpu=self.app_config["total_task_cpu"],
+            compatibility=(
+                ecs.Compatibility.EC2
+                if self.placement == "ec2"
+                else ecs.Compatibility.FARGATE
+            ),
+            network_mode=ecs.NetworkMode.AWS_VPC,
+            memory_mib=str(self.app_config["total_task_memory"]),
+            cpu=str(self.app_config["total_task_cpu"]),
         )
 
         self.ecs_task_definition.add_container(
@@ -36,6 +53,10 @@ class AppSpecificComputeConstruct(Construct):
             port_mappings=[
                 ecs.PortMapping(container_port=common_infra.networking.ecs_task_port)
             ],
+            environment={
+                # Tags DB sessions so slow queries/Performance Insights map to this app
+                "PGAPPNAME": self.app_config["name"],
+            },
             secrets={
                 "DB_CREDS": ecs.Secret.from_secrets_manager(
                     common_infra.storage.db_creds_secret  # Creds to allow app backends to access RDS cluster
@@ -43,7 +64,78 @@ class AppSpecificComputeConstruct(Construct):
             },
         )
 
-        self.ecs_service = ecs.FargateService(
+        if self.placement == "ec2":
+            self.ecs_service = self.create_ec2_service(common_infra)
+            self.configure_task_scaling()
+        else:
+            self.ecs_service = self.create_fargate_service(common_infra)
+
+    def validate_placement(self, common_infra: CommonInfraStack):
+        if self.placement not in ("fargate", "ec2"):
+            raise ValueError(
+                f"App '{self.app_config['name']}' has invalid placement "
+                f"'{self.placement}' - must be 'fargate' or 'ec2'"
+            )
+        if (
+            self.placement == "ec2"
+            and common_infra.compute.ec2_capacity_provider is None
+        ):
+            raise ValueError(
+                f"App '{self.app_config['name']}' has 'ec2' placement but EC2 "
+                "capacity is not enabled in compute config"
+            )
+        # Warm hosts only pre-pull the images listed in compute config
+        if (
+            self.placement == "ec2"
+            and self.app_config["backend_docker_image"]
+            not in common_infra.compute.compute_config["ec2_cached_images"]
+        ):
+            raise ValueError(
+                f"App '{self.app_config['name']}' has 'ec2' placement but its image "
+                f"'{self.app_config['backend_docker_image']}' is not listed in "
+                "'ec2_cached_images' in compute config"
+            )
+        # With prefer-cached, hosts keep running whatever copy of a mutable tag
+        # (e.g. "latest") they pulled first, silently ignoring newer pushes
+        if (
+            self.placement == "ec2"
+            and common_infra.compute.compute_config["ec2_image_pull_behavior"]
+            == "prefer-cached"
+            and not self.is_pinned_image(self.app_config["backend_docker_image"])
+        ):
+            raise ValueError(
+                f"App '{self.app_config['name']}' image "
+                f"'{self.app_config['backend_docker_image']}' must be pinned to a "
+                "digest or a non-'latest' tag when using 'prefer-cached' image pulls"
+            )
+
+    @staticmethod
+    def is_pinned_image(docker_image: str) -> bool:
+        if "@sha256:" in docker_image:
+            return True
+        last_segment = docker_image.rsplit("/", 1)[-1]
+        return ":" in last_segment and last_segment.rsplit(":", 1)[1] != "latest"
+
+    def create_fargate_service(
+        self, common_infra: CommonInfraStack
+    ) -> ecs.FargateService:
+        return ecs.FargateService(
+            self,
+            f"{self.app_config['name'].title()}ECSService",
+            cluster=common_infra.compute.ecs_cluster,
+            task_definition=self.ecs_task_definition,
+            vpc_subnets=ec2.SubnetSelection(
+                subnets=common_infra.networking.vpc.select_subnets(
+                    subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+                ).subnets,
+            ),
+            security_groups=[common_infra.networking.ecs_sg],
+            min_healthy_percent=0,
+        )
+
+    def create_ec2_service(self, common_infra: CommonInfraStack) -> ecs.Ec2Service:
+        # Scale out onto the common EC2 capacity provider (and its warm pool)
+        return ecs.Ec2Service(
             self,
             f"{self.app_config['name'].title()}ECSService",
             cluster=common_infra.compute.ecs_cluster,
@@ -54,5 +146,27 @@ class AppSpecificComputeConstruct(Construct):
                 ).subnets,
             ),
             security_groups=[common_infra.networking.ecs_sg],
+            capacity_provider_strategies=[
+                ecs.CapacityProviderStrategy(
+                    capacity_provider=common_infra.compute.ec2_capacity_provider.capacity_provider_name,
+                    weight=1,
+                )
+            ],
             min_healthy_percent=0,
         )
+
+    def configure_task_scaling(self):
+        # Scale task count on CPU, so new pending tasks drive the capacity provider's
+        # managed scaling to pull hosts from the warm pool
+        task_scaling = {
+            **DEFAULT_EC2_TASK_SCALING,
+            **self.app_config.get("task_scaling", {}),
+        }
+        scalable_task_count = self.ecs_service.auto_scale_task_count(
+            min_capacity=task_scaling["min_task_count"],
+            max_capacity=task_scaling["max_task_count"],
+        )
+        scalable_task_count.scale_on_cpu_utilization(
+            f"{self.app_config['name'].title()}CpuScaling",
+            target_utilization_percent=task_scaling["target_cpu_utilisation_percent"],
+        )
@@ -1,10 +1,107 @@
+import re
+
 from aws_cdk import (
+    Aws,
+    Duration,
+    aws_autoscaling as autoscaling,
+    aws_ec2 as ec2,
     aws_ecs as ecs,
+    aws_iam as iam,
+    custom_resources as cr,
 )
 from constructs import Construct
 
 from app_ecosystem.constructs.common.networking import CommonNetworkingConstruct
 
+# Matches private ECR image URIs, capturing account, region and repository name
+ECR_IMAGE_PATTERN = re.compile(
+    r"^(?P<account>\d{12})\.dkr\.ecr\.(?P<region>[a-z0-9-]+)\.amazonaws\.com"
+    r"/(?P<repository>[^:@]+)"
+)
+
+# Name of the launching lifecycle hook the pre-pull script completes
+IMAGE_PRE_PULL_HOOK_NAME = "ImagePrePull"
+
+# Pre-pull script run by a systemd unit (after docker.service) on each EC2 host.
+# Images are pulled once per instance (skipped when resuming from the warm pool),
+# failures are retried then logged to the journal/console, and the launching
+# lifecycle hook is completed for every lifecycle transition (into the warm pool,
+# and back out of it), so the ASG never stops/hibernates a host mid-pull
+IMAGE_PRE_PULL_SCRIPT_HEADER = (
+    "#!/bin/bash\n"
+    "set -uo pipefail\n"
+    f"HOOK_NAME={IMAGE_PRE_PULL_HOOK_NAME}\n"
+    """MARKER=/var/lib/ecs-image-pre-pull/complete
+imds() {
+  local token
+  token=$(curl -sf -X PUT http://169.254.169.254/latest/api/token -H "X-aws-ec2-metadata-token-ttl-seconds: 300") &&
+    curl -sf -H "X-aws-ec2-metadata-token: $token" "http://169.254.169.254/latest/meta-data/$1"
+}
+ecr_login() {
+  aws ecr get-login-password --region "$1" | docker login --username AWS --password-stdin "$2"
+}
+pull() {
+  for attempt in 1 2 3 4 5; do
+    docker pull "$1" && return 0
+    echo "Pull of $1 failed (attempt $attempt/5)" >&2
+    sleep $((attempt * 10))
+  done
+  echo "ERROR: giving up on pre-pulling $1" >&2
+  return 1
+}
+pre_pull() {
+  local failed=0
+"""
+)
+
+IMAGE_PRE_PULL_SCRIPT_FOOTER = """  return $failed
+}
+
+if [ ! -f "$MARKER" ]; then
+  if pre_pull; then
+    mkdir -p "$(dirname "$MARKER")" && touch "$MARKER"
+  else
+    echo "ERROR: image pre-pull failed - tasks will pull images at placement" >&2
+  fi
+fi
+
+instance_id=$(imds instance-id)
+region=$(imds placement/region)
+asg_name=$(imds tags/instance/aws:autoscaling:groupName)
+completed_state=""
+while true; do
+  state=$(imds autoscaling/target-lifecycle-state || true)
+  if [ -n "$state" ] && [ "$state" != "$completed_state" ]; then
+    if aws autoscaling complete-lifecycle-action --region "$region" \\
+      --auto-scaling-group-name "$asg_name" --lifecycle-hook-name "$HOOK_NAME" \\
+      --instance-id "$instance_id" --lifecycle-action-result CONTINUE; then
+      echo "Completed $HOOK_NAME lifecycle action (target state $state)"
+    else
+      echo "WARNING: no $HOOK_NAME lifecycle action completed (target state $state)" >&2
+    fi
+    completed_state=$state
+  fi
+  sleep 5
+done
+"""
+
+IMAGE_PRE_PULL_UNIT = """[Unit]
+Description=Pre-pull app images into the local Docker cache for ECS
+After=docker.service network-online.target
+Requires=docker.service
+Wants=network-online.target
+
+[Service]
+Type=simple
+ExecStart=/usr/local/bin/ecs-image-pre-pull.sh
+Restart=on-failure
+StandardOutput=journal+console
+StandardError=journal+console
+
+[Install]
+WantedBy=multi-user.target
+"""
+
 
 class CommonComputeConstruct(Construct):
     def __init__(
@@ -12,10 +109,13 @@ class CommonComputeConstruct(Construct):
         scope: Construct,
         id: str,
         common_networking: CommonNetworkingConstruct,
+        compute_config: dict,
         **kwargs,
     ) -> None:
         super().__init__(scope, id, **kwargs)
 
+        self.compute_config = compute_config
+
         # Common ECS Cluster to host all application backends as separate ECS services
         self.ecs_cluster = ecs.Cluster(
             self,
@@ -23,3 +123,237 @@ class CommonComputeConstruct(Construct):
             vpc=common_networking.vpc,
             enable_fargate_capacity_providers=True,
         )
+
+        # Optional EC2 capacity (with a warm pool) for apps that need fast scale-out
+        self.ec2_capacity_provider = None
+        if self.compute_config["ec2_capacity_enabled"]:
+            self.ec2_capacity_provider = self.create_ec2_capacity_provider(
+                common_networking
+            )
+            self.ecs_cluster.add_asg_capacity_provider(self.ec2_capacity_provider)
+
+    def create_ec2_user_data(self) -> ec2.UserData:
+        # Instances in the warm pool must not register with the cluster until they
+        # are moved into service
+        user_data = ec2.UserData.for_linux()
+        user_data.add_commands(
+            "echo ECS_WARM_POOL_CHECK=true >> /etc/ecs/ecs.config",
+            "echo ECS_IMAGE_PULL_BEHAVIOR="
+            f"{self.compute_config['ec2_image_pull_behavior']} >> /etc/ecs/ecs.config",
+        )
+
+        cached_images = self.compute_config["ec2_cached_images"]
+        if not cached_images:
+            return user_data
+
+        # Pull images at instance launch, so instances resumed from the warm pool
+        # already have their layers cached when ECS places a task on them
+        script_lines = [IMAGE_PRE_PULL_SCRIPT_HEADER.rstrip("\n")]
+        for registry, region in sorted(
+            {
+                (image.split("/")[0], match["region"])
+                for image in cached_images
+                if (match := ECR_IMAGE_PATTERN.match(image))
+            }
+        ):
+            script_lines.append(f"  ecr_login {region} {registry} || failed=1")
+        for image in cached_images:
+            script_lines.append(f"  pull {image} || failed=1")
+        script_lines.append(IMAGE_PRE_PULL_SCRIPT_FOOTER)
+
+        # Run from a systemd unit rather than inline, so the pull is ordered after
+        # the Docker daemon and doesn't block cloud-init (which docker may wait on)
+        user_data.add_commands(
+            "cat > /usr/local/bin/ecs-image-pre-pull.sh <<'EOF'",
+            *"\n".join(script_lines).splitlines(),
+            "EOF",
+            "chmod +x /usr/local/bin/ecs-image-pre-pull.sh",
+            "cat > /etc/systemd/system/ecs-image-pre-pull.service <<'EOF'",
+            *IMAGE_PRE_PULL_UNIT.splitlines(),
+            "EOF",
+            "systemctl daemon-reload",
+            "systemctl enable --now --no-block ecs-image-pre-pull.service",
+        )
+        return user_data
+
+    def grant_ecr_pull(self, role: iam.Role):
+        # Allow hosts to pull any private ECR images listed for pre-pulling
+        repository_arns = sorted(
+            {
+                f"arn:{Aws.PARTITION}:ecr:{match['region']}:{match['account']}:"
+                f"repository/{match['repository']}"
+                for image in self.compute_config["ec2_cached_images"]
+                if (match := ECR_IMAGE_PATTERN.match(image))
+            }
+        )
+        if not repository_arns:
+            return
+
+        role.add_to_policy(
+            iam.PolicyStatement(
+                actions=["ecr:GetAuthorizationToken"],
+                resources=["*"],
+            )
+        )
+        role.add_to_policy(
+            iam.PolicyStatement(
+                actions=[
+                    "ecr:BatchCheckLayerAvailability",
+                    "ecr:BatchGetImage",
+                    "ecr:GetDownloadUrlForLayer",
+                ],
+                resources=repository_arns,
+            )
+        )
+
+    def create_ec2_capacity_provider(
+        self, common_networking: CommonNetworkingConstruct
+    ) -> ecs.AsgCapacityProvider:
+        # Hosts only need outbound access (ECS control plane, image registries) -
+        # inbound task traffic goes to task ENIs via the ECS security group
+        ec2_host_sg = ec2.SecurityGroup(
+            self,
+            "ECSHostSecurityGroup",
+            vpc=common_networking.vpc,
+            allow_all_outbound=True,
+            description="Security group for ECS EC2 container instances",
+        )
+
+        ec2_host_role = iam.Role(
+            self,
+            "ECSHostRole",
+            assumed_by=iam.ServicePrincipal("ec2.amazonaws.com"),
+        )
+        self.grant_ecr_pull(ec2_host_role)
+
+        warm_pool_state = autoscaling.PoolState[
+            self.compute_config["ec2_warm_pool_state"]
+        ]
+
+        launch_template = ec2.LaunchTemplate(
+            self,
+            "ECSHostLaunchTemplate",
+            instance_type=ec2.InstanceType(self.compute_config["ec2_instance_type"]),
+            machine_image=ecs.EcsOptimizedImage.amazon_linux2023(),
+            user_data=self.create_ec2_user_data(),
+            role=ec2_host_role,
+            security_group=ec2_host_sg,
+            require_imdsv2=True,
+            # Lets the pre-pull script read its ASG name from instance metadata
+            instance_metadata_tags=True,
+            # Hibernation requires an encrypted root volume large enough to hold RAM
+            # plus the OS - size ec2_root_volume_size_gib to the instance type
+            hibernation_configured=warm_pool_state == autoscaling.PoolState.HIBERNATED,
+            block_devices=[
+                ec2.BlockDevice(
+                    device_name="/dev/xvda",
+                    volume=ec2.BlockDeviceVolume.ebs(
+                        self.compute_config["ec2_root_volume_size_gib"],
+                        encrypted=True,
+                        volume_type=ec2.EbsDeviceVolumeType.GP3,
+                    ),
+                )
+            ],
+        )
+
+        auto_scaling_group = autoscaling.AutoScalingGroup(
+            self,
+            "ECSHostAutoScalingGroup",
+            vpc=common_networking.vpc,
+            vpc_subnets=ec2.SubnetSelection(
+                subnets=common_networking.vpc.select_subnets(
+                    subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+                ).subnets,
+            ),
+            launch_template=launch_template,
+            min_capacity=self.compute_config["ec2_min_capacity"],
+            max_capacity=self.compute_config["ec2_max_capacity"],
+        )
+
+        auto_scaling_group.add_warm_pool(
+            min_size=self.compute_config["ec2_warm_pool_min_size"],
+            pool_state=warm_pool_state,
+            reuse_on_scale_in=True,
+        )
+
+        if self.compute_config["ec2_cached_images"]:
+            self.create_image_pre_pull_hook(auto_scaling_group, ec2_host_role)
+
+        self.create_instance_refresh(auto_scaling_group, launch_template)
+
+        return ecs.AsgCapacityProvider(
+            self,
+            "ECSHostCapacityProvider",
+            auto_scaling_group=auto_scaling_group,
+            enable_managed_scaling=True,
+            target_capacity_percent=self.compute_config["ec2_target_capacity_percent"],
+        )
+
+    def create_image_pre_pull_hook(
+        self,
+        auto_scaling_group: autoscaling.AutoScalingGroup,
+        ec2_host_role: iam.Role,
+    ) -> autoscaling.LifecycleHook:
+        # Hold launching instances (into the warm pool or into service) until the
+        # pre-pull script completes the hook, so warm hosts are only stopped or
+        # hibernated once their images are cached. CONTINUE on timeout, so a stuck
+        # pull delays rather than blocks scale-out
+        lifecycle_hook = auto_scaling_group.add_lifecycle_hook(
+            "ImagePrePullHook",
+            lifecycle_hook_name=IMAGE_PRE_PULL_HOOK_NAME,
+            lifecycle_transition=autoscaling.LifecycleTransition.INSTANCE_LAUNCHING,
+            default_result=autoscaling.DefaultResult.CONTINUE,
+            heartbeat_timeout=Duration.minutes(10),
+        )
+        # A standalone policy (rather than the role's default policy, which the
+        # launch template depends on) avoids a role -> ASG -> role dependency cycle
+        iam.Policy(
+            self,
+            "ECSHostLifecycleHookPolicy",
+            roles=[ec2_host_role],
+            statements=[
+                iam.PolicyStatement(
+                    actions=["autoscaling:CompleteLifecycleAction"],
+                    resources=[auto_scaling_group.auto_scaling_group_arn],
+                )
+            ],
+        )
+        return lifecycle_hook
+
+    def create_instance_refresh(
+        self,
+        auto_scaling_group: autoscaling.AutoScalingGroup,
+        launch_template: ec2.LaunchTemplate,
+    ) -> cr.AwsCustomResource:
+        # Start an instance refresh whenever a new launch template version is
+        # deployed, so in service AND warm pool instances pick up user data changes
+        # (e.g. new images to pre-pull). The ASG already tracks the latest version,
+        # so no desired configuration (and no launch template permissions) are
+        # needed - the version only goes in the physical ID to trigger updates.
+        # Scale-in protected instances are refreshed too, relying on ECS managed
+        # draining to move their tasks first. If a refresh is already running, the
+        # call is skipped rather than failing the stack update
+        instance_refresh_call = cr.AwsSdkCall(
+            service="AutoScaling",
+            action="startInstanceRefresh",
+            parameters={
+                "AutoScalingGroupName": auto_scaling_group.auto_scaling_group_name,
+                "Preferences": {
+                    "MinHealthyPercentage": 50,
+                    "SkipMatching": True,
+                    "ScaleInProtectedInstances": "Refresh",
+                },
+            },
+            physical_resource_id=cr.PhysicalResourceId.of(
+                launch_template.latest_version_number
+            ),
+            ignore_error_codes_matching="InstanceRefreshInProgress.*",
+        )
+        return cr.AwsCustomResource(
+            self,
+            "ECSHostInstanceRefresh",
+            on_update=instance_refresh_call,
+            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
+                resources=[auto_scaling_group.auto_scaling_group_arn]
+            ),
+        )
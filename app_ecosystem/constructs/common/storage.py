@@ -1,6 +1,7 @@
 from aws_cdk import (
     aws_rds as rds,
     aws_ec2 as ec2,
+    aws_logs as logs,
     Duration,
     RemovalPolicy,
 )
@@ -16,10 +17,17 @@ class CommonStorageConstruct(Construct):
         id: str,
         *,
         common_networking: CommonNetworkingConstruct,
+        storage_config: dict,
         **kwargs,
     ):
         super().__init__(scope, id, **kwargs)
 
+        self.storage_config = storage_config
+
+        self.db_engine = rds.DatabaseClusterEngine.aurora_postgres(
+            version=rds.AuroraPostgresEngineVersion.VER_17_5
+        )
+
         # DB Credentials Secret
         self.db_creds_secret = rds.DatabaseSecret(
             self,
@@ -28,13 +36,14 @@ class CommonStorageConstruct(Construct):
             dbname="appdb",
         )
 
+        self.db_parameter_group = self.create_db_parameter_group()
+
         # RDS Serverless Database Cluster
         self.db_cluster = rds.DatabaseCluster(
             self,
             "AppDatabaseCluster",
-            engine=rds.DatabaseClusterEngine.aurora_postgres(
-                version=rds.AuroraPostgresEngineVersion.VER_17_5
-            ),
+            engine=self.db_engine,
+            parameter_group=self.db_parameter_group,
             vpc=common_networking.vpc,
             vpc_subnets=ec2.SubnetSelection(
                 subnets=common_networking.vpc.select_subnets(
@@ -51,4 +60,55 @@ class CommonStorageConstruct(Construct):
             serverless_v2_auto_pause_duration=Duration.minutes(5),
             removal_policy=RemovalPolicy.DESTROY,
             writer=rds.ClusterInstance.serverless_v2("AppDatabaseWriterInstance"),
+            **self.get_db_monitoring_props(),
         )
+
+    def create_db_parameter_group(self) -> rds.ParameterGroup:
+        # Cluster parameter group enabling slow query logging and query statistics
+        # log_connections records each session's application_name against its PID,
+        # which the fixed Aurora log prefix includes, so slow queries can be traced
+        # back to the app (PGAPPNAME) that issued them
+        return rds.ParameterGroup(
+            self,
+            "AppDatabaseParameterGroup",
+            engine=self.db_engine,
+            description="Parameter group for shared app database cluster",
+            parameters={
+                "shared_preload_libraries": "pg_stat_statements,auto_explain",
+                "pg_stat_statements.track": "all",
+                "log_min_duration_statement": str(
+                    self.storage_config["db_log_min_duration_statement_ms"]
+                ),
+                "auto_explain.log_min_duration": str(
+                    self.storage_config["db_auto_explain_log_min_duration_ms"]
+                ),
+                "log_connections": "1",
+            },
+        )
+
+    def get_db_monitoring_props(self) -> dict:
+        # Build Performance Insights, enhanced monitoring and log export props
+        # dynamically, so each can be switched off via the storage config
+        props = {}
+
+        if self.storage_config["db_performance_insights_enabled"]:
+            props["enable_performance_insights"] = True
+            props["performance_insight_retention"] = rds.PerformanceInsightRetention[
+                self.storage_config["db_performance_insights_retention"]
+            ]
+
+        # An interval of 0 disables enhanced monitoring (as per RDS itself)
+        if self.storage_config["db_monitoring_interval_seconds"]:
+            props["monitoring_interval"] = Duration.seconds(
+                self.storage_config["db_monitoring_interval_seconds"]
+            )
+
+        if self.storage_config["db_cloudwatch_logs_exports"]:
+            props["cloudwatch_logs_exports"] = self.storage_config[
+                "db_cloudwatch_logs_exports"
+            ]
+            props["cloudwatch_logs_retention"] = logs.RetentionDays[
+                self.storage_config["db_cloudwatch_logs_retention"]
+            ]
+
+        return props
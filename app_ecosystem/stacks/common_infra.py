@@ -10,7 +10,13 @@ from app_ecosystem.constructs.common.compute import CommonComputeConstruct
 
 class CommonInfraStack(Stack):
     def __init__(
-        self, scope: Construct, construct_id: str, network_config: dict, **kwargs
+        self,
+        scope: Construct,
+        construct_id: str,
+        network_config: dict,
+        storage_config: dict,
+        compute_config: dict,
+        **kwargs,
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
@@ -24,10 +30,12 @@ class CommonInfraStack(Stack):
             self,
             "CommonStorage",
             common_networking=self.networking,
+            storage_config=storage_config,
         )
 
         self.compute = CommonComputeConstruct(
             self,
             "CommonCompute",
             common_networking=self.networking,
+            compute_config=compute_config,
         )